@@ -1,5 +1,6 @@
 import os
-from dataclasses import dataclass, field
+from copy import copy, deepcopy
+from dataclasses import dataclass, field, fields
 from typing import Any, Dict, List, Optional, Union
 
 from mashumaro.types import SerializableType
@@ -125,6 +126,20 @@ class BaseSourceFile(dbtClassMixin, SerializableType):
     def original_file_path(self):
         return self.path.original_file_path
 
+    def clone(self):
+        """Return a copy of this source file that is independent of the
+        original, like deepcopy but faster: the path and checksum only
+        hold scalars, contents is an immutable string, and the remaining
+        containers are the only things partial parsing modifies."""
+        new_file = copy(self)
+        new_file.path = copy(self.path)
+        new_file.checksum = copy(self.checksum)
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, (dict, list)):
+                setattr(new_file, f.name, deepcopy(value))
+        return new_file
+
     def _serialize(self):
         dct = self.to_dict()
         return dct
@@ -217,7 +232,13 @@ class SchemaSourceFile(BaseSourceFile):
     unrendered_databases: Dict[str, Any] = field(default_factory=dict)
     unrendered_schemas: Dict[str, Any] = field(default_factory=dict)
     pp_dict: Optional[Dict[str, Any]] = None
+    # yaml key -> name -> patch, for the lists in pp_dict. Kept by
+    # merge_patch and reset whenever pp_dict is replaced.
+    pp_dict_index: Optional[Dict[str, Dict[str, Any]]] = None
     pp_test_index: Optional[Dict[str, Any]] = None
+    # yaml key -> name -> element, for the lists in dfy. Built by
+    # find_element and reset whenever dfy is replaced.
+    dfy_index: Optional[Dict[str, Dict[str, Any]]] = None
 
     @property
     def dict_from_yaml(self):
@@ -238,11 +259,33 @@ class SchemaSourceFile(BaseSourceFile):
     def __post_serialize__(self, dct: Dict, context: Optional[Dict] = None):
         dct = super().__post_serialize__(dct, context)
         # Remove partial parsing specific data
-        for key in ("pp_test_index", "pp_dict"):
+        for key in ("pp_test_index", "pp_dict", "pp_dict_index", "dfy_index"):
             if key in dct:
                 del dct[key]
         return dct
 
+    def clone(self):
+        new_file = super().clone()
+        # The indexes refer to this file's yaml elements, not the copies
+        new_file.pp_dict_index = None
+        new_file.dfy_index = None
+        return new_file
+
+    # Find an element in one of the dict_from_yaml lists by name. The first
+    # element with the name wins. Each list is indexed by name the first
+    # time it's searched.
+    def find_element(self, yaml_key, name):
+        if self.dfy_index is None:
+            self.dfy_index = {}
+        elements_by_name = self.dfy_index.get(yaml_key)
+        if elements_by_name is None:
+            elements_by_name = {}
+            for element in self.dfy.get(yaml_key, ()):
+                if "name" in element:
+                    elements_by_name.setdefault(element["name"], element)
+            self.dfy_index[yaml_key] = elements_by_name
+        return elements_by_name.get(name)
+
     def append_patch(self, yaml_key, unique_id):
         self.node_patches.append(unique_id)
 
@@ -10,6 +10,7 @@ from typing import (
     DefaultDict,
     Dict,
     Generic,
+    Iterable,
     List,
     Mapping,
     MutableMapping,
@@ -1563,29 +1564,25 @@ class Manifest(MacroMethods, dbtClassMixin):
 
     # Methods that were formerly in ParseResult
     def add_macro(self, source_file: SourceFile, macro: Macro):
-        if macro.unique_id in self.macros:
-            # detect that the macro exists and emit an error
-            raise DuplicateMacroInPackageError(macro=macro, macro_mapping=self.macros)
-
-        self.macros[macro.unique_id] = macro
+        self.add_macros(source_file, [macro])
 
+    def add_macros(self, source_file: SourceFile, macros: Iterable[Macro]):
+        # Build the lookup indexes before inserting anything, so that the new
+        # macros are only added to them once.
         if self._macros_by_name is None:
             self._macros_by_name = self._build_macros_by_name(self.macros)
-
-        if macro.name not in self._macros_by_name:
-            self._macros_by_name[macro.name] = []
-
-        self._macros_by_name[macro.name].append(macro)
-
         if self._macros_by_package is None:
             self._macros_by_package = self._build_macros_by_package(self.macros)
 
-        if macro.package_name not in self._macros_by_package:
-            self._macros_by_package[macro.package_name] = {}
-
-        self._macros_by_package[macro.package_name][macro.name] = macro
+        for macro in macros:
+            if macro.unique_id in self.macros:
+                # detect that the macro exists and emit an error
+                raise DuplicateMacroInPackageError(macro=macro, macro_mapping=self.macros)
 
-        source_file.macros.append(macro.unique_id)
+            self.macros[macro.unique_id] = macro
+            self._macros_by_name.setdefault(macro.name, []).append(macro)
+            self._macros_by_package.setdefault(macro.package_name, {})[macro.name] = macro
+            source_file.macros.append(macro.unique_id)
 
     def has_file(self, source_file: SourceFile) -> bool:
         key = source_file.file_id
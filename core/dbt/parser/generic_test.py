@@ -12,6 +12,8 @@ from dbt.parser.search import FileBlock
 from dbt_common.clients import jinja
 from dbt_common.utils import MACRO_PREFIX
 
+_MACRO_PREFIX_LEN = len(MACRO_PREFIX)
+
 
 class GenericTestParser(BaseParser[GenericTestNode]):
     @property
@@ -76,7 +78,7 @@ class GenericTestParser(BaseParser[GenericTestNode]):
             if not generic_test_name.startswith(MACRO_PREFIX):
                 continue
 
-            name: str = generic_test_name.replace(MACRO_PREFIX, "")
+            name: str = generic_test_name[_MACRO_PREFIX_LEN:]
             node = self.create_generic_test_macro(block, base_node, name)
             yield node
 
@@ -1,4 +1,6 @@
-from typing import Iterable, List
+import re
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, cast
 
 import jinja2
 
@@ -13,8 +15,55 @@ from dbt.node_types import NodeType
 from dbt.parser.base import BaseParser
 from dbt.parser.search import FileBlock, filesystem_search
 from dbt_common.clients import jinja
-from dbt_common.clients._jinja_blocks import ExtractWarning
 from dbt_common.utils import MACRO_PREFIX
+from dbt_common.utils.jinja import get_dbt_macro_name, get_test_macro_name
+
+_MACRO_PREFIX_LEN = len(MACRO_PREFIX)
+
+
+@lru_cache(maxsize=4096)
+def _parse_block(source: str) -> jinja2.nodes.Template:
+    # The same macro blocks show up over and over (dispatched adapter macros,
+    # package macros, remote macro parsing), and the resulting AST is only ever
+    # read from, so identical blocks can safely share a single parse.
+    return jinja.parse(source)
+
+
+# A `{% macro %}` or `{% test %}` block whose signature only lists plain
+# argument names and whose body contains no Jinja at all. Blocks like this can't
+# fail to parse, so the equivalent AST node can be built without running Jinja's
+# lexer/parser.
+_SIMPLE_MACRO_BLOCK = re.compile(
+    r"\{%-?\s*(macro|test)\s+([A-Za-z_]\w*)\s*"
+    r"\(\s*((?:[A-Za-z_]\w*\s*(?:,\s*[A-Za-z_]\w*\s*)*)?)\)\s*-?%\}"
+    r"[^{]*"
+    r"\{%-?\s*end\1\s*-?%\}",
+    re.ASCII,
+)
+# Jinja refuses to assign to these names
+_RESERVED_NAMES = frozenset(("true", "false", "none", "True", "False", "None"))
+_SIMPLE_MACRO_NAMERS: Dict[str, Callable[[str], str]] = {
+    "macro": get_dbt_macro_name,
+    "test": get_test_macro_name,
+}
+
+
+def _simple_macro_node(source: str) -> Optional[jinja2.nodes.Macro]:
+    match = _SIMPLE_MACRO_BLOCK.fullmatch(source)
+    if match is None:
+        return None
+
+    block_type, name, args = match.groups()
+    arg_names = [arg.strip() for arg in args.split(",")] if args else []
+    if name in _RESERVED_NAMES or not _RESERVED_NAMES.isdisjoint(arg_names):
+        return None
+
+    return jinja2.nodes.Macro(
+        _SIMPLE_MACRO_NAMERS[block_type](name),
+        [jinja2.nodes.Name(arg, "param") for arg in arg_names],
+        [],
+        [],
+    )
 
 
 class MacroParser(BaseParser[Macro]):
@@ -33,89 +82,102 @@ class MacroParser(BaseParser[Macro]):
     def get_compiled_path(cls, block: FileBlock):
         return block.path.relative_path
 
-    def parse_macro(self, block: jinja.BlockTag, base_node: UnparsedMacro, name: str) -> Macro:
-        unique_id = self.generate_unique_id(name)
-        macro_sql = block.full_block or ""
-
+    def parse_macro(
+        self, block: jinja.BlockTag, name: str, unique_id: str, **base_fields: Any
+    ) -> Macro:
         return Macro(
-            path=base_node.path,
-            macro_sql=macro_sql,
-            original_file_path=base_node.original_file_path,
-            package_name=base_node.package_name,
-            resource_type=base_node.resource_type,
+            macro_sql=block.full_block or "",
             name=name,
             unique_id=unique_id,
+            **base_fields,
         )
 
     def parse_unparsed_macros(self, base_node: UnparsedMacro) -> Iterable[Macro]:
+        # Every jinja tag starts with a "{", so there's nothing for the block
+        # extractor to find (or complain about) in files without one.
+        if "{" not in base_node.raw_code:
+            return
+
         # This is a bit of a hack to get the file path to the deprecation
-        def wrap_handle_extract_warning(warning: ExtractWarning) -> None:
-            self._handle_extract_warning(warning=warning, file=base_node.original_file_path)
+        wrap_handle_extract_warning = partial(
+            self._handle_extract_warning, file=base_node.original_file_path
+        )
 
         try:
-            blocks: List[jinja.BlockTag] = [
-                t
-                for t in jinja.extract_toplevel_blocks(
+            # without collect_raw_data, only BlockTags are returned
+            blocks = cast(
+                List[jinja.BlockTag],
+                jinja.extract_toplevel_blocks(
                     base_node.raw_code,
                     allowed_blocks={"macro", "materialization", "test", "data_test"},
                     collect_raw_data=False,
                     warning_callback=wrap_handle_extract_warning,
-                )
-                if isinstance(t, jinja.BlockTag)
-            ]
+                ),
+            )
         except ParsingError as exc:
             exc.add_node(base_node)
             raise
 
+        # these are the same for every macro in the file
+        base_fields = {
+            "path": base_node.path,
+            "original_file_path": base_node.original_file_path,
+            "package_name": base_node.package_name,
+            "resource_type": base_node.resource_type,
+        }
+        # equivalent to generate_unique_id(name), without rebuilding the shared
+        # part of the id for every macro
+        unique_id_prefix = f"{self.resource_type}.{self.project.project_name}."
+        validate_macro_args = getattr(get_flags(), "validate_macro_args", False)
+
         for block in blocks:
-            try:
-                ast = jinja.parse(block.full_block)
-            except ParsingError as e:
-                e.add_node(base_node)
-                raise
-
-            if (
-                isinstance(ast, jinja2.nodes.Template)
-                and hasattr(ast, "body")
-                and len(ast.body) == 1
-                and isinstance(ast.body[0], jinja2.nodes.Macro)
-            ):
-                # If the top level node in the Template is a Macro, things look
-                # good and this is much faster than traversing the full ast, as
-                # in the following else clause. It's not clear if that traversal
-                # is ever really needed.
-                macro = ast.body[0]
-            else:
-                macro_nodes = list(ast.find_all(jinja2.nodes.Macro))
-
-                if len(macro_nodes) != 1:
-                    # things have gone disastrously wrong, we thought we only
-                    # parsed one block!
-                    raise ParsingError(
-                        f"Found multiple macros in {block.full_block}, expected 1", node=base_node
-                    )
-
-                macro = macro_nodes[0]
+            macro: Optional[jinja2.nodes.Macro] = None
+            # data_test isn't a jinja tag, so those blocks always need the full
+            # parse to raise the appropriate error
+            if block.block_type_name in _SIMPLE_MACRO_NAMERS:
+                macro = _simple_macro_node(block.full_block or "")
+
+            if macro is None:
+                macro = self._parse_macro_node(block, base_node)
 
             if not macro.name.startswith(MACRO_PREFIX):
                 continue
 
-            name: str = macro.name.replace(MACRO_PREFIX, "")
-            node = self.parse_macro(block, base_node, name)
+            name: str = macro.name[_MACRO_PREFIX_LEN:]
+            node = self.parse_macro(block, name, unique_id_prefix + name, **base_fields)
 
-            if getattr(get_flags(), "validate_macro_args", False):
-                node.arguments = self._extract_args(macro)
+            if validate_macro_args:
+                node.arguments = [MacroArgument(name=arg.name) for arg in macro.args]
 
             # get supported_languages for materialization macro
             if block.block_type_name == "materialization":
                 node.supported_languages = get_supported_languages(macro)
             yield node
 
-    def _extract_args(self, macro) -> List[MacroArgument]:
+    def _parse_macro_node(
+        self, block: jinja.BlockTag, base_node: UnparsedMacro
+    ) -> jinja2.nodes.Macro:
         try:
-            return list([MacroArgument(name=arg.name) for arg in macro.args])
-        except Exception:
-            return []
+            ast = _parse_block(block.full_block)
+        except ParsingError as e:
+            e.add_node(base_node)
+            raise
+
+        # extract_toplevel_blocks hands us exactly one block, so its macro is
+        # always a top level node of the Template. There's no need to walk the
+        # full ast looking for nested Macro nodes.
+        macro_nodes = [
+            node for node in ast.iter_child_nodes() if isinstance(node, jinja2.nodes.Macro)
+        ]
+
+        if len(macro_nodes) != 1:
+            # things have gone disastrously wrong, we thought we only
+            # parsed one block!
+            raise ParsingError(
+                f"Found multiple macros in {block.full_block}, expected 1", node=base_node
+            )
+
+        return macro_nodes[0]
 
     def parse_file(self, block: FileBlock):
         assert isinstance(block.file, SourceFile)
@@ -133,5 +195,4 @@ class MacroParser(BaseParser[Macro]):
             language="sql",
         )
 
-        for node in self.parse_unparsed_macros(base_node):
-            self.manifest.add_macro(block.file, node)
+        self.manifest.add_macros(block.file, self.parse_unparsed_macros(base_node))
@@ -1,6 +1,7 @@
 import os
 from copy import deepcopy
-from typing import Callable, Dict, List, MutableMapping, Union
+from functools import cached_property
+from typing import Any, Callable, Dict, List, MutableMapping, Set, Tuple, Union
 
 from dbt.constants import DEFAULT_ENV_PLACEHOLDER
 from dbt.contracts.files import (
@@ -18,17 +19,21 @@ from dbt_common.context import get_invocation_context
 from dbt_common.events.base_types import EventLevel
 from dbt_common.events.functions import fire_event
 
-mssat_files = (
-    ParseFileType.Model,
-    ParseFileType.Seed,
-    ParseFileType.Snapshot,
-    ParseFileType.Analysis,
-    ParseFileType.SingularTest,
+mssat_files = frozenset(
+    (
+        ParseFileType.Model,
+        ParseFileType.Seed,
+        ParseFileType.Snapshot,
+        ParseFileType.Analysis,
+        ParseFileType.SingularTest,
+    )
 )
 
-mg_files = (
-    ParseFileType.Macro,
-    ParseFileType.GenericTest,
+mg_files = frozenset(
+    (
+        ParseFileType.Macro,
+        ParseFileType.GenericTest,
+    )
 )
 
 
@@ -48,23 +53,53 @@ parse_file_type_to_key = {
 }
 
 
+# Resources that schedule_nodes_for_parsing reschedules by removing their
+# yaml element from the schema file: resource type (the unique_id prefix) to
+# the manifest dictionary and yaml key, the attribute holding the yaml
+# element's name, and the PartialParsing method that deletes it
+schedule_schema_element_by_resource_type = {
+    NodeType.Source: ("sources", "source_name", "delete_schema_source"),
+    NodeType.Exposure: ("exposures", "name", "delete_schema_exposure"),
+    NodeType.Metric: ("metrics", "name", "delete_schema_metric"),
+    NodeType.SemanticModel: ("semantic_models", "name", "delete_schema_semantic_model"),
+    NodeType.SavedQuery: ("saved_queries", "name", "delete_schema_saved_query"),
+    NodeType.Unit: ("unit_tests", "name", "delete_schema_unit_test"),
+}
+
+
+# The remaining yaml keys handled by handle_schema_file_changes, in order,
+# with the PartialParsing method that deletes a changed or deleted element
+schema_element_delete_methods = (
+    ("macros", "delete_schema_macro_patch"),
+    ("exposures", "delete_schema_exposure"),
+    ("metrics", "delete_schema_metric"),
+    ("groups", "delete_schema_group"),
+    ("semantic_models", "delete_schema_semantic_model"),
+    ("unit_tests", "delete_schema_unit_test"),
+    ("saved_queries", "delete_schema_saved_query"),
+    ("data_tests", "delete_schema_data_test_patch"),
+)
+
+
 # These macro names have special treatment in the ManifestLoader and
 # partial parsing. If they have changed we will skip partial parsing
-special_override_macros = [
-    "ref",
-    "source",
-    "config",
-    "generate_schema_name",
-    "generate_database_name",
-    "generate_alias_name",
-]
+special_override_macros = frozenset(
+    (
+        "ref",
+        "source",
+        "config",
+        "generate_schema_name",
+        "generate_database_name",
+        "generate_alias_name",
+    )
+)
 
 
 # Partial parsing. Create a diff of files from saved manifest and current
 # files and produce a project_parser_file dictionary to drive parsing of
 # only the necessary changes.
 # Will produce a 'skip_parsing' method, and a project_parser_file dictionary
-# All file objects from the new manifest are deepcopied, because we need
+# All file objects from the new manifest are cloned, because we need
 # to preserve an unchanged file object in case we need to drop back to a
 # a full parse (such as for certain macro changes)
 class PartialParsing:
@@ -74,9 +109,19 @@ class PartialParsing:
         self.saved_manifest = saved_manifest
         self.new_files = new_files
         self.project_parser_files: Dict = {}
+        # The file_ids in project_parser_files. A file_id determines both the
+        # project and the parser, so this is enough to check for duplicates.
+        self.scheduled_file_ids: Set[str] = set()
         self.saved_files = self.saved_manifest.files
-        self.project_parser_files = {}
+        # file_id -> the copy of the new file put in saved files by
+        # copy_new_file_to_saved
+        self.new_file_copies: Dict[str, AnySourceFile] = {}
         self.macro_child_map: Dict[str, List[str]] = {}
+        # file_id -> (schema file, {resource list: (yaml element name ->
+        # unique_ids, disabled unique_ids)}), see get_unique_ids_index
+        self._unique_ids_index: Dict[
+            str, Tuple[SchemaSourceFile, Dict[str, Tuple[Dict[str, List[str]], List[str]]]]
+        ] = {}
         (
             self.env_vars_changed_source_files,
             self.env_vars_changed_schema_files,
@@ -84,7 +129,12 @@ class PartialParsing:
         self.build_file_diff()
         self.processing_file = None
         self.deleted_special_override_macro = False
-        self.disabled_by_file_id = self.saved_manifest.build_disabled_by_file_id()
+
+    # Only needed when removing nodes from saved, so it isn't built when
+    # there's nothing to parse
+    @cached_property
+    def disabled_by_file_id(self):
+        return self.saved_manifest.build_disabled_by_file_id()
 
     def skip_parsing(self):
         return (
@@ -98,53 +148,58 @@ class PartialParsing:
     # Compare the previously saved manifest files and the just-loaded manifest
     # files to see if anything changed
     def build_file_diff(self):
-        saved_file_ids = set(self.saved_files.keys())
-        new_file_ids = set(self.new_files.keys())
-        deleted_all_files = saved_file_ids.difference(new_file_ids)
-        added = new_file_ids.difference(saved_file_ids)
-        common = saved_file_ids.intersection(new_file_ids)
-        changed_or_deleted_macro_file = False
-
-        # separate out deleted schema files
-        deleted_schema_files = []
-        deleted = []
-        for file_id in deleted_all_files:
-            if self.saved_files[file_id].parse_file_type == ParseFileType.Schema:
-                deleted_schema_files.append(file_id)
-            else:
-                if self.saved_files[file_id].parse_file_type in mg_files:
-                    changed_or_deleted_macro_file = True
-                deleted.append(file_id)
-
+        # Partition the saved files in a single pass, looking each one up in
+        # the new files once.
+        # deleted and deleted_schema_files are sets because they're checked
+        # for membership a lot while scheduling files for parsing
+        deleted_schema_files = set()
+        deleted = set()
         changed = []
         changed_schema_files = []
         unchanged = []
-        for file_id in common:
-            if self.saved_files[file_id].checksum == self.new_files[file_id].checksum:
+        changed_or_deleted_macro_file = False
+        new_files = self.new_files
+        for file_id, sf in self.saved_files.items():
+            nf = new_files.get(file_id)
+            if nf is None:
+                # separate out deleted schema files
+                parse_file_type = sf.parse_file_type
+                if parse_file_type == ParseFileType.Schema:
+                    deleted_schema_files.add(file_id)
+                else:
+                    if parse_file_type in mg_files:
+                        changed_or_deleted_macro_file = True
+                    deleted.add(file_id)
+            elif sf.checksum == nf.checksum:
                 unchanged.append(file_id)
             else:
                 # separate out changed schema files
-                if self.saved_files[file_id].parse_file_type == ParseFileType.Schema:
-                    sf = self.saved_files[file_id]
-                    if type(sf).__name__ != "SchemaSourceFile":
+                parse_file_type = sf.parse_file_type
+                if parse_file_type == ParseFileType.Schema:
+                    if not isinstance(sf, SchemaSourceFile):
                         raise Exception(f"Serialization failure for {file_id}")
                     changed_schema_files.append(file_id)
                 else:
-                    if self.saved_files[file_id].parse_file_type in mg_files:
+                    if parse_file_type in mg_files:
                         changed_or_deleted_macro_file = True
                     changed.append(file_id)
+        added = new_files.keys() - self.saved_files.keys()
 
         # handle changed env_vars for non-schema-files
-        for file_id in self.env_vars_changed_source_files:
-            if file_id in deleted or file_id in changed:
-                continue
-            changed.append(file_id)
+        if self.env_vars_changed_source_files:
+            skip = deleted.union(changed)
+            changed.extend(
+                file_id for file_id in self.env_vars_changed_source_files if file_id not in skip
+            )
 
         # handle changed env_vars for schema files
-        for file_id in self.env_vars_changed_schema_files.keys():
-            if file_id in deleted_schema_files or file_id in changed_schema_files:
-                continue
-            changed_schema_files.append(file_id)
+        if self.env_vars_changed_schema_files:
+            skip = deleted_schema_files.union(changed_schema_files)
+            changed_schema_files.extend(
+                file_id
+                for file_id in self.env_vars_changed_schema_files.keys()
+                if file_id not in skip
+            )
 
         file_diff = {
             "deleted": deleted,
@@ -154,8 +209,7 @@ class PartialParsing:
             "changed_schema_files": changed_schema_files,
             "unchanged": unchanged,
         }
-        if changed_or_deleted_macro_file:
-            self.macro_child_map = self.saved_manifest.build_macro_child_map()
+        self.changed_or_deleted_macro_file = changed_or_deleted_macro_file
         deleted = len(deleted) + len(deleted_schema_files)
         changed = len(changed) + len(changed_schema_files)
         event = PartialParsingEnabled(deleted=deleted, added=len(added), changed=changed)
@@ -171,6 +225,10 @@ class PartialParsing:
     def get_parsing_files(self):
         if self.skip_parsing():
             return {}
+        # The macro child map has to reflect the saved manifest before
+        # anything is removed from it, so it's built here rather than lazily
+        if self.changed_or_deleted_macro_file:
+            self.macro_child_map = self.saved_manifest.build_macro_child_map()
         # Need to add new files first, because changes in schema files
         # might refer to them
         for file_id in self.file_diff["added"]:
@@ -202,33 +260,24 @@ class PartialParsing:
                 f"Did not find parse_file_type or project_name "
                 f"in SourceFile for {source_file.file_id}"
             )
-        if project_name not in self.project_parser_files:
-            self.project_parser_files[project_name] = {}
-        if parser_name not in self.project_parser_files[project_name]:
-            self.project_parser_files[project_name][parser_name] = []
+        parser_files = self.project_parser_files.setdefault(project_name, {}).setdefault(
+            parser_name, []
+        )
         if (
-            file_id not in self.project_parser_files[project_name][parser_name]
+            file_id not in self.scheduled_file_ids
             and file_id not in self.file_diff["deleted"]
             and file_id not in self.file_diff["deleted_schema_files"]
         ):
-            self.project_parser_files[project_name][parser_name].append(file_id)
+            parser_files.append(file_id)
+            self.scheduled_file_ids.add(file_id)
 
     def already_scheduled_for_parsing(self, source_file):
-        file_id = source_file.file_id
-        project_name = source_file.project_name
-        if project_name not in self.project_parser_files:
-            return False
-        parser_name = parse_file_type_to_parser[source_file.parse_file_type]
-        if parser_name not in self.project_parser_files[project_name]:
-            return False
-        if file_id not in self.project_parser_files[project_name][parser_name]:
-            return False
-        return True
+        return source_file.file_id in self.scheduled_file_ids
 
     # Add new files, including schema files
     def add_to_saved(self, file_id):
         # add file object to saved manifest.files
-        source_file = deepcopy(self.new_files[file_id])
+        source_file = self.new_files[file_id].clone()
         if source_file.parse_file_type == ParseFileType.Schema:
             self.handle_added_schema_file(source_file)
         self.saved_files[file_id] = source_file
@@ -238,6 +287,7 @@ class PartialParsing:
 
     def handle_added_schema_file(self, source_file):
         source_file.pp_dict = source_file.dict_from_yaml.copy()
+        source_file.pp_dict_index = None
         if "sources" in source_file.pp_dict:
             for source in source_file.pp_dict["sources"]:
                 # We need to remove the original source, so it can
@@ -247,17 +297,18 @@ class PartialParsing:
 
     def delete_disabled(self, unique_id, file_id):
         # This node/metric/exposure is disabled. Find it and remove it from disabled dictionary.
-        for dis_index, dis_node in enumerate(self.saved_manifest.disabled[unique_id]):
+        disabled_nodes = self.saved_manifest.disabled[unique_id]
+        for index, dis_node in enumerate(disabled_nodes):
             if dis_node.file_id == file_id:
-                node = dis_node
-                index = dis_index
                 break
+        else:
+            raise Exception(f"Did not find disabled node {unique_id} for {file_id}")
         # Remove node from disabled
-        del self.saved_manifest.disabled[unique_id][index]
+        node = disabled_nodes.pop(index)
         # if all nodes were removed for the unique id, delete the unique_id
         # from the disabled dict
-        if not self.saved_manifest.disabled[unique_id]:
-            self.saved_manifest.disabled.pop(unique_id)
+        if not disabled_nodes:
+            del self.saved_manifest.disabled[unique_id]
 
         return node
 
@@ -267,39 +318,56 @@ class PartialParsing:
         # nodes, and update pp_files to parse unless the
         # file creating those nodes has also been deleted
         saved_source_file = self.saved_files[file_id]
+        parse_file_type = saved_source_file.parse_file_type
 
         # SQL file: models, seeds, snapshots, analyses, tests: SQL files, except
         # macros/tests
-        if saved_source_file.parse_file_type in mssat_files:
+        if parse_file_type in mssat_files:
             self.remove_mssat_file(saved_source_file)
             self.saved_manifest.files.pop(file_id)
 
         # macros
-        if saved_source_file.parse_file_type in mg_files:
+        if parse_file_type in mg_files:
             self.delete_macro_file(saved_source_file, follow_references=True)
 
         # docs
-        if saved_source_file.parse_file_type == ParseFileType.Documentation:
+        if parse_file_type == ParseFileType.Documentation:
             self.delete_doc_node(saved_source_file)
 
         # fixtures
-        if saved_source_file.parse_file_type == ParseFileType.Fixture:
+        if parse_file_type == ParseFileType.Fixture:
             self.delete_fixture_node(saved_source_file)
 
         fire_event(PartialParsingFile(operation="deleted", file_id=file_id))
 
+    # Copy a new file to saved files to get its current contents. If the saved
+    # file is still a copy made here it's reused, so rescheduling a file that's
+    # referenced by many nodes only copies it once.
+    def copy_new_file_to_saved(self, file_id):
+        if not self.saved_file_is_new_copy(file_id):
+            new_file_copy = self.new_files[file_id].clone()
+            self.saved_files[file_id] = self.new_file_copies[file_id] = new_file_copy
+        return self.saved_files[file_id]
+
+    def saved_file_is_new_copy(self, file_id):
+        new_file_copy = self.new_file_copies.get(file_id)
+        return new_file_copy is not None and self.saved_files.get(file_id) is new_file_copy
+
     # Updates for non-schema files
     def update_in_saved(self, file_id):
-        new_source_file = deepcopy(self.new_files[file_id])
+        # This is the copy that replaces the saved file, so the update_*_in_saved
+        # methods don't need to clone it again
+        new_source_file = self.new_files[file_id].clone()
         old_source_file = self.saved_files[file_id]
+        parse_file_type = new_source_file.parse_file_type
 
-        if new_source_file.parse_file_type in mssat_files:
+        if parse_file_type in mssat_files:
             self.update_mssat_in_saved(new_source_file, old_source_file)
-        elif new_source_file.parse_file_type in mg_files:
+        elif parse_file_type in mg_files:
             self.update_macro_in_saved(new_source_file, old_source_file)
-        elif new_source_file.parse_file_type == ParseFileType.Documentation:
+        elif parse_file_type == ParseFileType.Documentation:
             self.update_doc_in_saved(new_source_file, old_source_file)
-        elif new_source_file.parse_file_type == ParseFileType.Fixture:
+        elif parse_file_type == ParseFileType.Fixture:
             self.update_fixture_in_saved(new_source_file, old_source_file)
         else:
             raise Exception(f"Invalid parse_file_type in source_file {file_id}")
@@ -320,80 +388,72 @@ class PartialParsing:
             unique_ids = old_source_file.nodes
 
         # replace source_file in saved and add to parsing list
-        file_id = new_source_file.file_id
-        self.saved_files[file_id] = deepcopy(new_source_file)
+        self.saved_files[new_source_file.file_id] = new_source_file
         self.add_to_pp_files(new_source_file)
         for unique_id in unique_ids:
             self.remove_node_in_saved(new_source_file, unique_id)
 
     def remove_node_in_saved(self, source_file, unique_id):
-        if unique_id in self.saved_manifest.nodes:
-            # delete node in saved
-            node = self.saved_manifest.nodes.pop(unique_id)
-        elif (
-            source_file.file_id in self.disabled_by_file_id
-            and unique_id in self.saved_manifest.disabled
-        ):
-            # This node is disabled. Find the node and remove it from disabled dictionary.
-            node = self.delete_disabled(unique_id, source_file.file_id)
-        else:
-            # Has already been deleted by another action
-            return
+        # delete node in saved
+        node = self.saved_manifest.nodes.pop(unique_id, None)
+        if node is None:
+            if (
+                source_file.file_id in self.disabled_by_file_id
+                and unique_id in self.saved_manifest.disabled
+            ):
+                # This node is disabled. Find the node and remove it from disabled dictionary.
+                node = self.delete_disabled(unique_id, source_file.file_id)
+            else:
+                # Has already been deleted by another action
+                return
 
         # look at patch_path in model node to see if we need
         # to reapply a patch from a schema_file.
         if node.patch_path:
             file_id = node.patch_path
             # it might be changed...  then what?
+            schema_file = self.saved_files.get(file_id)
+            dict_key = parse_file_type_to_key.get(source_file.parse_file_type)
             if (
                 file_id not in self.file_diff["deleted"]
-                and file_id in self.saved_files
-                and source_file.parse_file_type in parse_file_type_to_key
+                and schema_file is not None
+                and dict_key is not None
             ):
                 # Schema files should already be updated if this comes from a node,
                 # but this code is also called when updating groups and exposures.
                 # This might save the old schema file element, so when the schema file
                 # is processed, it should overwrite it by passing True to "merge_patch"
-                schema_file = self.saved_files[file_id]
-                dict_key = parse_file_type_to_key[source_file.parse_file_type]
                 # look for a matching list dictionary
-                elem_patch = None
-                if dict_key in schema_file.dict_from_yaml:
-                    for elem in schema_file.dict_from_yaml[dict_key]:
-                        if elem["name"] == node.name:
-                            elem_patch = elem
-                            break
+                elem_patch = schema_file.find_element(dict_key, node.name)
                 if elem_patch:
                     self.delete_schema_mssa_links(schema_file, dict_key, elem_patch)
                     self.merge_patch(schema_file, dict_key, elem_patch)
                     if unique_id in schema_file.node_patches:
                         schema_file.node_patches.remove(unique_id)
-            if unique_id in self.saved_manifest.disabled:
-                # We have a patch_path in disabled nodes with a patch so
-                # that we can connect the patch to the node
-                for node in self.saved_manifest.disabled[unique_id]:
-                    node.patch_path = None
+            # We have a patch_path in disabled nodes with a patch so
+            # that we can connect the patch to the node
+            for node in self.saved_manifest.disabled.get(unique_id, ()):
+                node.patch_path = None
 
     def update_macro_in_saved(self, new_source_file, old_source_file):
         if self.already_scheduled_for_parsing(old_source_file):
             return
         self.handle_macro_file_links(old_source_file, follow_references=True)
-        file_id = new_source_file.file_id
-        self.saved_files[file_id] = deepcopy(new_source_file)
+        self.saved_files[new_source_file.file_id] = new_source_file
         self.add_to_pp_files(new_source_file)
 
     def update_doc_in_saved(self, new_source_file, old_source_file):
         if self.already_scheduled_for_parsing(old_source_file):
             return
         self.delete_doc_node(old_source_file)
-        self.saved_files[new_source_file.file_id] = deepcopy(new_source_file)
+        self.saved_files[new_source_file.file_id] = new_source_file
         self.add_to_pp_files(new_source_file)
 
     def update_fixture_in_saved(self, new_source_file, old_source_file):
         if self.already_scheduled_for_parsing(old_source_file):
             return
         self.delete_fixture_node(old_source_file)
-        self.saved_files[new_source_file.file_id] = deepcopy(new_source_file)
+        self.saved_files[new_source_file.file_id] = new_source_file
         self.add_to_pp_files(new_source_file)
 
     def remove_mssat_file(self, source_file: AnySourceFile):
@@ -414,59 +474,51 @@ class PartialParsing:
 
     def schedule_nodes_for_parsing(self, unique_ids):
         for unique_id in unique_ids:
-            if unique_id in self.saved_manifest.nodes:
-                node = self.saved_manifest.nodes[unique_id]
+            # The resource type prefix of the unique_id determines which
+            # manifest dictionary it can be in
+            resource_type = unique_id.split(".", 1)[0]
+            if resource_type in schedule_schema_element_by_resource_type:
+                dict_key, name_attr, delete_method = schedule_schema_element_by_resource_type[
+                    resource_type
+                ]
+                element = getattr(self.saved_manifest, dict_key).get(unique_id)
+                if element is not None:
+                    self._schedule_for_parsing(
+                        dict_key,
+                        element,
+                        getattr(element, name_attr),
+                        getattr(self, delete_method),
+                    )
+            elif resource_type == NodeType.Macro:
+                macro = self.saved_manifest.macros.get(unique_id)
+                if macro is None:
+                    continue
+                file_id = macro.file_id
+                if (
+                    file_id in self.saved_files
+                    and file_id not in self.file_diff["deleted"]
+                    and not self.saved_file_is_new_copy(file_id)
+                ):
+                    source_file = self.saved_files[file_id]
+                    self.delete_macro_file(source_file)
+                    self.add_to_pp_files(self.copy_new_file_to_saved(file_id))
+            else:
+                node = self.saved_manifest.nodes.get(unique_id)
+                if node is None:
+                    continue
                 if node.resource_type == NodeType.Test and node.test_node_type == "generic":
                     # test nodes are handled separately. Must be removed from schema file
                     continue
                 file_id = node.file_id
-                if file_id in self.saved_files and file_id not in self.file_diff["deleted"]:
+                if (
+                    file_id in self.saved_files
+                    and file_id not in self.file_diff["deleted"]
+                    and not self.saved_file_is_new_copy(file_id)
+                ):
                     source_file = self.saved_files[file_id]
                     self.remove_mssat_file(source_file)
                     # content of non-schema files is only in new files
-                    self.saved_files[file_id] = deepcopy(self.new_files[file_id])
-                    self.add_to_pp_files(self.saved_files[file_id])
-            elif unique_id in self.saved_manifest.sources:
-                source = self.saved_manifest.sources[unique_id]
-                self._schedule_for_parsing(
-                    "sources", source, source.source_name, self.delete_schema_source
-                )
-            elif unique_id in self.saved_manifest.exposures:
-                exposure = self.saved_manifest.exposures[unique_id]
-                self._schedule_for_parsing(
-                    "exposures", exposure, exposure.name, self.delete_schema_exposure
-                )
-            elif unique_id in self.saved_manifest.metrics:
-                metric = self.saved_manifest.metrics[unique_id]
-                self._schedule_for_parsing(
-                    "metrics", metric, metric.name, self.delete_schema_metric
-                )
-            elif unique_id in self.saved_manifest.semantic_models:
-                semantic_model = self.saved_manifest.semantic_models[unique_id]
-                self._schedule_for_parsing(
-                    "semantic_models",
-                    semantic_model,
-                    semantic_model.name,
-                    self.delete_schema_semantic_model,
-                )
-            elif unique_id in self.saved_manifest.saved_queries:
-                saved_query = self.saved_manifest.saved_queries[unique_id]
-                self._schedule_for_parsing(
-                    "saved_queries", saved_query, saved_query.name, self.delete_schema_saved_query
-                )
-            elif unique_id in self.saved_manifest.macros:
-                macro = self.saved_manifest.macros[unique_id]
-                file_id = macro.file_id
-                if file_id in self.saved_files and file_id not in self.file_diff["deleted"]:
-                    source_file = self.saved_files[file_id]
-                    self.delete_macro_file(source_file)
-                    self.saved_files[file_id] = deepcopy(self.new_files[file_id])
-                    self.add_to_pp_files(self.saved_files[file_id])
-            elif unique_id in self.saved_manifest.unit_tests:
-                unit_test = self.saved_manifest.unit_tests[unique_id]
-                self._schedule_for_parsing(
-                    "unit_tests", unit_test, unit_test.name, self.delete_schema_unit_test
-                )
+                    self.add_to_pp_files(self.copy_new_file_to_saved(file_id))
 
     def _schedule_for_parsing(self, dict_key: str, element, name, delete: Callable) -> None:
         file_id = element.file_id
@@ -476,11 +528,8 @@ class PartialParsing:
             and file_id not in self.file_diff["deleted_schema_files"]
         ):
             schema_file = self.saved_files[file_id]
-            elements = []
             assert isinstance(schema_file, SchemaSourceFile)
-            if dict_key in schema_file.dict_from_yaml:
-                elements = schema_file.dict_from_yaml[dict_key]
-            schema_element = self.get_schema_element(elements, name)
+            schema_element = schema_file.find_element(dict_key, name)
             if schema_element:
                 delete(schema_file, schema_element)
                 self.merge_patch(schema_file, dict_key, schema_element)
@@ -494,31 +543,43 @@ class PartialParsing:
             self.saved_files.pop(file_id)
 
     def check_for_special_deleted_macros(self, source_file):
+        if self.deleted_special_override_macro:
+            # Already found one, and one is enough to skip partial parsing
+            return
         for unique_id in source_file.macros:
-            if unique_id in self.saved_manifest.macros:
-                package_name = unique_id.split(".")[1]
-                if package_name == "dbt":
-                    continue
-                macro = self.saved_manifest.macros[unique_id]
-                if macro.name in special_override_macros:
-                    self.deleted_special_override_macro = True
+            macro = self.saved_manifest.macros.get(unique_id)
+            if macro is None or macro.package_name == "dbt":
+                continue
+            if macro.name in special_override_macros:
+                self.deleted_special_override_macro = True
+                return
 
     def recursively_gather_macro_references(self, macro_unique_id, referencing_nodes):
-        for unique_id in self.macro_child_map[macro_unique_id]:
-            if unique_id in referencing_nodes:
-                continue
-            referencing_nodes.append(unique_id)
-            if unique_id.startswith("macro."):
-                self.recursively_gather_macro_references(unique_id, referencing_nodes)
+        # A depth first walk of the macro child map, gathering nodes in the same
+        # order as recursing into each macro child would, but with an explicit
+        # stack of child iterators and a set of the nodes already gathered.
+        gathered = set(referencing_nodes)
+        stack = [iter(self.macro_child_map[macro_unique_id])]
+        while stack:
+            for unique_id in stack[-1]:
+                if unique_id in gathered:
+                    continue
+                gathered.add(unique_id)
+                referencing_nodes.append(unique_id)
+                if unique_id.startswith("macro."):
+                    stack.append(iter(self.macro_child_map[unique_id]))
+                    break
+            else:
+                stack.pop()
 
     def handle_macro_file_links(self, source_file, follow_references=False):
-        # remove the macros in the 'macros' dictionary
-        macros = source_file.macros.copy()
-        for unique_id in macros:
+        # remove the macros in the 'macros' dictionary. Every macro in the file
+        # is removed, so the list is reset at the end rather than removing
+        # ids one at a time. Handling macro children can end up back here for
+        # this same file, which is fine since the list isn't modified in place.
+        for unique_id in source_file.macros:
             if unique_id not in self.saved_manifest.macros:
                 # This happens when a macro has already been removed
-                if unique_id in source_file.macros:
-                    source_file.macros.remove(unique_id)
                 continue
 
             base_macro = self.saved_manifest.macros.pop(unique_id)
@@ -537,22 +598,17 @@ class PartialParsing:
                 file_id = base_macro.patch_path
                 if file_id in self.saved_files:
                     schema_file = self.saved_files[file_id]
-                    macro_patches = []
-                    if "macros" in schema_file.dict_from_yaml:
-                        macro_patches = schema_file.dict_from_yaml["macros"]
-                    macro_patch = self.get_schema_element(macro_patches, base_macro.name)
+                    macro_patch = schema_file.find_element("macros", base_macro.name)
                     self.delete_schema_macro_patch(schema_file, macro_patch)
                     self.merge_patch(schema_file, "macros", macro_patch)
-            # The macro may have already been removed by handling macro children
-            if unique_id in source_file.macros:
-                source_file.macros.remove(unique_id)
+        source_file.macros = []
 
     # similar to schedule_nodes_for_parsing but doesn't do sources and exposures
     # and handles schema tests
     def schedule_macro_nodes_for_parsing(self, unique_ids):
         for unique_id in unique_ids:
-            if unique_id in self.saved_manifest.nodes:
-                node = self.saved_manifest.nodes[unique_id]
+            node = self.saved_manifest.nodes.get(unique_id)
+            if node is not None:
                 # Both generic tests from yaml files and singular tests have NodeType.Test
                 # so check for generic test.
                 if node.resource_type == NodeType.Test and node.test_node_type == "generic":
@@ -560,10 +616,7 @@ class PartialParsing:
                     schema_file = self.saved_manifest.files[schema_file_id]
                     (key, name) = schema_file.get_key_and_name_for_test(node.unique_id)
                     if key and name:
-                        patch_list = []
-                        if key in schema_file.dict_from_yaml:
-                            patch_list = schema_file.dict_from_yaml[key]
-                        patch = self.get_schema_element(patch_list, name)
+                        patch = schema_file.find_element(key, name)
                         if patch:
                             if key in ["models", "seeds", "snapshots"]:
                                 self.delete_schema_mssa_links(schema_file, key, patch)
@@ -579,27 +632,31 @@ class PartialParsing:
                                 self.merge_patch(schema_file, "sources", patch)
                 else:
                     file_id = node.file_id
-                    if file_id in self.saved_files and file_id not in self.file_diff["deleted"]:
+                    if (
+                        file_id in self.saved_files
+                        and file_id not in self.file_diff["deleted"]
+                        and not self.saved_file_is_new_copy(file_id)
+                    ):
                         source_file = self.saved_files[file_id]
                         self.remove_mssat_file(source_file)
                         # content of non-schema files is only in new files
-                        self.saved_files[file_id] = deepcopy(self.new_files[file_id])
-                        self.add_to_pp_files(self.saved_files[file_id])
+                        self.add_to_pp_files(self.copy_new_file_to_saved(file_id))
             elif unique_id in self.saved_manifest.macros:
-                macro = self.saved_manifest.macros[unique_id]
-                file_id = macro.file_id
-                if file_id in self.saved_files and file_id not in self.file_diff["deleted"]:
+                file_id = self.saved_manifest.macros[unique_id].file_id
+                if (
+                    file_id in self.saved_files
+                    and file_id not in self.file_diff["deleted"]
+                    and not self.saved_file_is_new_copy(file_id)
+                ):
                     source_file = self.saved_files[file_id]
                     self.delete_macro_file(source_file)
-                    self.saved_files[file_id] = deepcopy(self.new_files[file_id])
-                    self.add_to_pp_files(self.saved_files[file_id])
+                    self.add_to_pp_files(self.copy_new_file_to_saved(file_id))
 
     def delete_doc_node(self, source_file):
         # remove the nodes in the 'docs' dictionary
-        docs = source_file.docs.copy()
-        for unique_id in docs:
+        for unique_id in source_file.docs:
             self.saved_manifest.docs.pop(unique_id)
-            source_file.docs.remove(unique_id)
+        source_file.docs = []
         # The unique_id of objects that contain a doc call are stored in the
         # doc source_file.nodes
         self.schedule_nodes_for_parsing(source_file.nodes)
@@ -611,24 +668,26 @@ class PartialParsing:
         # remove fixtures from the "fixtures" dictionary
         fixture_unique_id = source_file.fixture
         self.saved_manifest.fixtures.pop(fixture_unique_id)
-        unit_tests = source_file.unit_tests.copy()
-        for unique_id in unit_tests:
+        for unique_id in source_file.unit_tests:
             unit_test = self.saved_manifest.unit_tests.pop(unique_id)
             # schedule unit_test for parsing
             self._schedule_for_parsing(
                 "unit_tests", unit_test, unit_test.name, self.delete_schema_unit_test
             )
-            source_file.unit_tests.remove(unique_id)
+        source_file.unit_tests = []
         self.saved_manifest.files.pop(source_file.file_id)
 
     # Schema files -----------------------
     # Changed schema files
     def change_schema_file(self, file_id):
         saved_schema_file = self.saved_files[file_id]
-        new_schema_file = deepcopy(self.new_files[file_id])
+        new_schema_file = self.new_files[file_id]
         saved_yaml_dict = saved_schema_file.dict_from_yaml
+        # The dfy stored below must stay as it was read, so handle_schema_file_changes
+        # only puts deep copies of the new yaml elements into pp_dict
         new_yaml_dict = new_schema_file.dict_from_yaml
         saved_schema_file.pp_dict = {}
+        saved_schema_file.pp_dict_index = None
         self.handle_schema_file_changes(saved_schema_file, saved_yaml_dict, new_yaml_dict)
 
         # copy from new schema_file to saved_schema_file to preserve references
@@ -636,6 +695,7 @@ class PartialParsing:
         saved_schema_file.contents = new_schema_file.contents
         saved_schema_file.checksum = new_schema_file.checksum
         saved_schema_file.dfy = new_schema_file.dfy
+        saved_schema_file.dfy_index = None
         # schedule parsing
         self.add_to_pp_files(saved_schema_file)
         # schema_file pp_dict should have been generated already
@@ -678,15 +738,16 @@ class PartialParsing:
                     self.merge_patch(schema_file, dict_key, elem, True)
             # Handle schema file updates due to env_var changes
             if dict_key in env_var_changes and dict_key in new_yaml_dict:
+                elements_by_name = self.get_schema_elements_by_name(new_yaml_dict[dict_key])
                 for name in env_var_changes[dict_key]:
                     if name in key_diff["changed_or_deleted_names"]:
                         continue
-                    elem = self.get_schema_element(new_yaml_dict[dict_key], name)
+                    elem = elements_by_name.get(name)
                     if elem:
                         if dict_key == "snapshots" and "relation" in elem:
                             self.delete_yaml_snapshot(schema_file, elem)
                         self.delete_schema_mssa_links(schema_file, dict_key, elem)
-                        self.merge_patch(schema_file, dict_key, elem, True)
+                        self.merge_patch(schema_file, dict_key, deepcopy(elem), True)
 
         # sources
         dict_key = "sources"
@@ -709,30 +770,27 @@ class PartialParsing:
                 self.merge_patch(schema_file, dict_key, source, True)
         # Handle schema file updates due to env_var changes
         if dict_key in env_var_changes and dict_key in new_yaml_dict:
+            sources_by_name = self.get_schema_elements_by_name(new_yaml_dict[dict_key])
             for name in env_var_changes[dict_key]:
                 if name in source_diff["changed_or_deleted_names"]:
                     continue
-                source = self.get_schema_element(new_yaml_dict[dict_key], name)
+                source = sources_by_name.get(name)
                 if source:
                     if "overrides" in source:
                         self.remove_source_override_target(source)
                     self.delete_schema_source(schema_file, source)
-                    self.merge_patch(schema_file, dict_key, source, True)
+                    self.merge_patch(schema_file, dict_key, deepcopy(source), True)
 
-        def handle_change(key: str, delete: Callable):
+        for key, delete_method_name in schema_element_delete_methods:
             self._handle_element_change(
-                schema_file, saved_yaml_dict, new_yaml_dict, env_var_changes, key, delete
+                schema_file,
+                saved_yaml_dict,
+                new_yaml_dict,
+                env_var_changes,
+                key,
+                getattr(self, delete_method_name),
             )
 
-        handle_change("macros", self.delete_schema_macro_patch)
-        handle_change("exposures", self.delete_schema_exposure)
-        handle_change("metrics", self.delete_schema_metric)
-        handle_change("groups", self.delete_schema_group)
-        handle_change("semantic_models", self.delete_schema_semantic_model)
-        handle_change("unit_tests", self.delete_schema_unit_test)
-        handle_change("saved_queries", self.delete_schema_saved_query)
-        handle_change("data_tests", self.delete_schema_data_test_patch)
-
     def _handle_element_change(
         self, schema_file, saved_yaml_dict, new_yaml_dict, env_var_changes, dict_key: str, delete
     ):
@@ -749,13 +807,14 @@ class PartialParsing:
                 self.merge_patch(schema_file, dict_key, element, True)
         # Handle schema file updates due to env_var changes
         if dict_key in env_var_changes and dict_key in new_yaml_dict:
+            elements_by_name = self.get_schema_elements_by_name(new_yaml_dict[dict_key])
             for name in env_var_changes[dict_key]:
                 if name in element_diff["changed_or_deleted_names"]:
                     continue
-                elem = self.get_schema_element(new_yaml_dict[dict_key], name)
+                elem = elements_by_name.get(name)
                 if elem:
                     delete(schema_file, elem)
-                    self.merge_patch(schema_file, dict_key, elem, True)
+                    self.merge_patch(schema_file, dict_key, deepcopy(elem), True)
 
     # Take a "section" of the schema file yaml dictionary from saved and new schema files
     # and determine which parts have changed
@@ -765,36 +824,41 @@ class PartialParsing:
             new_elements = new_yaml_dict[key] if key in new_yaml_dict else []
         else:
             return {"deleted": [], "added": [], "changed": []}
-        # for each set of keys, need to create a dictionary of names pointing to entry
-        saved_elements_by_name = {}
-        new_elements_by_name = {}
-        # sources have two part names?
-        for element in saved_elements:
-            saved_elements_by_name[element["name"]] = element
-        for element in new_elements:
-            new_elements_by_name[element["name"]] = element
-
-        # now determine which elements, by name, are added, deleted or changed
-        saved_element_names = set(saved_elements_by_name.keys())
-        new_element_names = set(new_elements_by_name.keys())
-        deleted = saved_element_names.difference(new_element_names)
-        added = new_element_names.difference(saved_element_names)
-        common = saved_element_names.intersection(new_element_names)
+        # index the new elements by name, then classify each saved element as
+        # deleted or changed in a single pass. Saved elements are walked in
+        # reverse so the last one with a name wins, as it would in a dict.
+        new_elements_by_name = {element["name"]: element for element in new_elements}
+        deleted = []
         changed = []
-        for element_name in common:
-            if saved_elements_by_name[element_name] != new_elements_by_name[element_name]:
-                changed.append(element_name)
-
-        # make lists of yaml elements to return as diffs
-        deleted_elements = [saved_elements_by_name[name].copy() for name in deleted]
-        added_elements = [new_elements_by_name[name].copy() for name in added]
-        changed_elements = [new_elements_by_name[name].copy() for name in changed]
-
+        changed_or_deleted_names = set()
+        saved_names = set()
+        for element in reversed(saved_elements):
+            name = element["name"]
+            if name in saved_names:
+                continue
+            saved_names.add(name)
+            new_element = new_elements_by_name.get(name)
+            if new_element is None:
+                deleted.append(element)
+                changed_or_deleted_names.add(name)
+            elif new_element != element:
+                changed.append(new_element)
+                changed_or_deleted_names.add(name)
+        deleted.reverse()
+        changed.reverse()
+        added = [
+            element for name, element in new_elements_by_name.items() if name not in saved_names
+        ]
+
+        # make lists of yaml elements to return as diffs. The added and changed
+        # elements end up in pp_dict, and parsing modifies them (including nested
+        # dicts like columns), so they are deep copied. Deleted elements are
+        # only read.
         diff = {
-            "deleted": deleted_elements,
-            "added": added_elements,
-            "changed": changed_elements,
-            "changed_or_deleted_names": list(changed) + list(deleted),
+            "deleted": [element.copy() for element in deleted],
+            "added": [deepcopy(element) for element in added],
+            "changed": [deepcopy(element) for element in changed],
+            "changed_or_deleted_names": changed_or_deleted_names,
         }
         return diff
 
@@ -804,21 +868,43 @@ class PartialParsing:
     def merge_patch(self, schema_file, key, patch, new_patch=False):
         if schema_file.pp_dict is None:
             schema_file.pp_dict = {}
+            schema_file.pp_dict_index = None
+        if schema_file.pp_dict_index is None:
+            schema_file.pp_dict_index = {}
         pp_dict = schema_file.pp_dict
+        pp_dict_index = schema_file.pp_dict_index
         if key not in pp_dict:
             pp_dict[key] = [patch]
+            pp_dict_index[key] = {patch["name"]: patch}
         else:
             # check that this patch hasn't already been saved
-            found_elem = None
-            for elem in pp_dict[key]:
-                if elem["name"] == patch["name"]:
-                    found_elem = elem
+            patches = pp_dict[key]
+            patches_by_name = pp_dict_index.get(key)
+            if patches_by_name is None:
+                # pp_dict was set up elsewhere, e.g. for an added schema file.
+                # The last patch with a name wins.
+                patches_by_name = {elem["name"]: elem for elem in patches}
+                pp_dict_index[key] = patches_by_name
+            found_elem = patches_by_name.get(patch["name"])
             if not found_elem:
-                pp_dict[key].append(patch)
-            elif found_elem and new_patch:
+                patches.append(patch)
+                patches_by_name[patch["name"]] = patch
+            elif new_patch:
                 # remove patch and replace with new one
-                pp_dict[key].remove(found_elem)
-                pp_dict[key].append(patch)
+                patches.remove(found_elem)
+                patches.append(patch)
+                patches_by_name[patch["name"]] = patch
+            else:
+                # A patch with this name is already scheduled. Either merging
+                # it cleared its env_vars and unrendered configs and scheduled
+                # the file, or it's from an added file, which was scheduled and
+                # has none. Only parsing adds those back, so there's nothing
+                # left to do.
+                return
+            # An added schema file's pp_dict shares its lists with the yaml
+            # dict, so the yaml list may have changed
+            if schema_file.dfy_index and patches is schema_file.dfy.get(key):
+                schema_file.dfy_index.pop(key, None)
 
         schema_file.delete_from_env_vars(key, patch["name"])
         schema_file.delete_from_unrendered_configs(key, patch["name"])
@@ -828,14 +914,13 @@ class PartialParsing:
     # delete the patches and tests from the patch
     def delete_schema_mssa_links(self, schema_file, dict_key, elem) -> None:
         # find elem node unique_id in node_patches
-        prefix = key_to_prefix[dict_key]
+        prefix = f"{key_to_prefix[dict_key]}."
+        elem_name = elem["name"]
         elem_unique_ids = []
         for unique_id in schema_file.node_patches:
             if not unique_id.startswith(prefix):
                 continue
-            parts = unique_id.split(".")
-            elem_name = parts[2]
-            if elem_name == elem["name"]:
+            if unique_id.split(".", 3)[2] == elem_name:
                 elem_unique_ids.append(unique_id)
 
         # remove elem node and remove unique_id from node_patches
@@ -858,7 +943,7 @@ class PartialParsing:
                     file_id = node.file_id
                     # need to copy new file to saved files in order to get content
                     if file_id in self.new_files:
-                        self.saved_files[file_id] = deepcopy(self.new_files[file_id])
+                        self.copy_new_file_to_saved(file_id)
                     if self.saved_files[file_id]:
                         source_file = self.saved_files[file_id]
                         self.add_to_pp_files(source_file)
@@ -886,16 +971,16 @@ class PartialParsing:
 
     def delete_yaml_snapshot(self, schema_file, snapshot_dict):
         snapshot_name = snapshot_dict["name"]
-        snapshots = schema_file.snapshots.copy()
+        snapshots = self.get_unique_ids_for_name(schema_file, "snapshots", snapshot_name)
         for unique_id in snapshots:
             if unique_id in self.saved_manifest.nodes:
                 snapshot = self.saved_manifest.nodes[unique_id]
                 if snapshot.name == snapshot_name:
                     self.saved_manifest.nodes.pop(unique_id)
-                    schema_file.snapshots.remove(unique_id)
+                    self.remove_unique_id_from_file(schema_file, "snapshots", unique_id)
             elif unique_id in self.saved_manifest.disabled:
                 self.delete_disabled(unique_id, schema_file.file_id)
-                schema_file.snapshots.remove(unique_id)
+                self.remove_unique_id_from_file(schema_file, "snapshots", unique_id)
 
     def delete_schema_source(self, schema_file, source_dict):
         # both patches, tests, and source nodes
@@ -903,13 +988,13 @@ class PartialParsing:
         # There may be multiple sources for each source dict, since
         # there will be a separate source node for each table.
         # SourceDefinition name = table name, dict name is source_name
-        sources = schema_file.sources.copy()
+        sources = self.get_unique_ids_for_name(schema_file, "sources", source_name)
         for unique_id in sources:
             if unique_id in self.saved_manifest.sources:
                 source = self.saved_manifest.sources[unique_id]
                 if source.source_name == source_name:
                     source = self.saved_manifest.sources.pop(unique_id)
-                    schema_file.sources.remove(unique_id)
+                    self.remove_unique_id_from_file(schema_file, "sources", unique_id)
                     self.schedule_referencing_nodes_for_parsing(unique_id)
 
         self.remove_tests(schema_file, "sources", source_name)
@@ -925,11 +1010,10 @@ class PartialParsing:
         if macro_unique_id and macro_unique_id in self.saved_manifest.macros:
             macro = self.saved_manifest.macros.pop(macro_unique_id)
             macro_file_id = macro.file_id
-            if macro_file_id in self.new_files:
+            if macro_file_id in self.new_files and not self.saved_file_is_new_copy(macro_file_id):
                 source_file = self.saved_files[macro_file_id]
                 self.delete_macro_file(source_file)
-                self.saved_files[macro_file_id] = deepcopy(self.new_files[macro_file_id])
-                self.add_to_pp_files(self.saved_files[macro_file_id])
+                self.add_to_pp_files(self.copy_new_file_to_saved(macro_file_id))
 
     def delete_schema_data_test_patch(self, schema_file, data_test):
         data_test_unique_id = None
@@ -945,79 +1029,54 @@ class PartialParsing:
             singular_data_test = self.saved_manifest.nodes.pop(data_test_unique_id)
             file_id = singular_data_test.file_id
             if file_id in self.new_files:
-                self.saved_files[file_id] = deepcopy(self.new_files[file_id])
-                self.add_to_pp_files(self.saved_files[file_id])
+                self.add_to_pp_files(self.copy_new_file_to_saved(file_id))
+
+    # Delete the resources of one type (exposures, metrics, saved queries,
+    # semantic models) created by the yaml element with the given name.
+    # dict_key is both the manifest dictionary and the schema file list.
+    # Metrics, saved queries and semantic models can be referred to by other
+    # nodes, so everything that referenced them is scheduled for parsing.
+    def delete_schema_resource(
+        self, schema_file, dict_key: str, elem_name: str, schedule_children: bool
+    ) -> None:
+        resources = getattr(self.saved_manifest, dict_key)
+        for unique_id in self.get_unique_ids_for_name(schema_file, dict_key, elem_name):
+            if unique_id in resources:
+                if resources[unique_id].name == elem_name:
+                    if schedule_children and unique_id in self.saved_manifest.child_map:
+                        self.schedule_nodes_for_parsing(self.saved_manifest.child_map[unique_id])
+                    resources.pop(unique_id)
+                    self.remove_unique_id_from_file(schema_file, dict_key, unique_id)
+            elif unique_id in self.saved_manifest.disabled:
+                self.delete_disabled(unique_id, schema_file.file_id)
 
     # exposures are created only from schema files, so just delete
     # the exposure or the disabled exposure.
     def delete_schema_exposure(self, schema_file, exposure_dict):
-        exposure_name = exposure_dict["name"]
-        exposures = schema_file.exposures.copy()
-        for unique_id in exposures:
-            if unique_id in self.saved_manifest.exposures:
-                exposure = self.saved_manifest.exposures[unique_id]
-                if exposure.name == exposure_name:
-                    self.saved_manifest.exposures.pop(unique_id)
-                    schema_file.exposures.remove(unique_id)
-            elif unique_id in self.saved_manifest.disabled:
-                self.delete_disabled(unique_id, schema_file.file_id)
+        self.delete_schema_resource(schema_file, "exposures", exposure_dict["name"], False)
 
     # groups are created only from schema files, so just delete the group
     def delete_schema_group(self, schema_file, group_dict):
         group_name = group_dict["name"]
-        groups = schema_file.groups.copy()
+        groups = self.get_unique_ids_for_name(schema_file, "groups", group_name)
         for unique_id in groups:
             if unique_id in self.saved_manifest.groups:
                 group = self.saved_manifest.groups[unique_id]
                 if group.name == group_name:
                     self.schedule_nodes_for_parsing(self.saved_manifest.group_map[group.name])
                     self.saved_manifest.groups.pop(unique_id)
-                    schema_file.groups.remove(unique_id)
+                    self.remove_unique_id_from_file(schema_file, "groups", unique_id)
 
     # metrics are created only from schema files, but also can be referred to by other nodes
     def delete_schema_metric(self, schema_file, metric_dict):
-        metric_name = metric_dict["name"]
-        metrics = schema_file.metrics.copy()
-        for unique_id in metrics:
-            if unique_id in self.saved_manifest.metrics:
-                metric = self.saved_manifest.metrics[unique_id]
-                if metric.name == metric_name:
-                    # Need to find everything that referenced this metric and schedule for parsing
-                    if unique_id in self.saved_manifest.child_map:
-                        self.schedule_nodes_for_parsing(self.saved_manifest.child_map[unique_id])
-                    self.saved_manifest.metrics.pop(unique_id)
-                    schema_file.metrics.remove(unique_id)
-            elif unique_id in self.saved_manifest.disabled:
-                self.delete_disabled(unique_id, schema_file.file_id)
+        self.delete_schema_resource(schema_file, "metrics", metric_dict["name"], True)
 
     def delete_schema_saved_query(self, schema_file, saved_query_dict):
-        saved_query_name = saved_query_dict["name"]
-        saved_queries = schema_file.saved_queries.copy()
-        for unique_id in saved_queries:
-            if unique_id in self.saved_manifest.saved_queries:
-                saved_query = self.saved_manifest.saved_queries[unique_id]
-                if saved_query.name == saved_query_name:
-                    # Need to find everything that referenced this saved_query and schedule for parsing
-                    if unique_id in self.saved_manifest.child_map:
-                        self.schedule_nodes_for_parsing(self.saved_manifest.child_map[unique_id])
-                    self.saved_manifest.saved_queries.pop(unique_id)
-            elif unique_id in self.saved_manifest.disabled:
-                self.delete_disabled(unique_id, schema_file.file_id)
+        self.delete_schema_resource(schema_file, "saved_queries", saved_query_dict["name"], True)
 
     def delete_schema_semantic_model(self, schema_file, semantic_model_dict):
         semantic_model_name = semantic_model_dict["name"]
-        semantic_models = schema_file.semantic_models.copy()
-        for unique_id in semantic_models:
-            if unique_id in self.saved_manifest.semantic_models:
-                semantic_model = self.saved_manifest.semantic_models[unique_id]
-                if semantic_model.name == semantic_model_name:
-                    # Need to find everything that referenced this semantic model and schedule for parsing
-                    if unique_id in self.saved_manifest.child_map:
-                        self.schedule_nodes_for_parsing(self.saved_manifest.child_map[unique_id])
-                    self.saved_manifest.semantic_models.pop(unique_id)
-                    schema_file.semantic_models.remove(unique_id)
-            elif unique_id in self.saved_manifest.disabled:
-                self.delete_disabled(unique_id, schema_file.file_id)
+        self.delete_schema_resource(schema_file, "semantic_models", semantic_model_name, True)
 
         if schema_file.generated_metrics:
             # If this partial parse file has an old "generated_metrics" list,
@@ -1031,16 +1090,72 @@ class PartialParsing:
                     self.delete_disabled(unique_id, schema_file.file_id)
             del schema_file.metrics_from_measures[semantic_model_name]
 
+    # Unit tests on versioned models have unique_ids ending in _v<version>,
+    # so they can't be found by name with get_unique_ids_for_name
     def delete_schema_unit_test(self, schema_file, unit_test_dict):
         unit_test_name = unit_test_dict["name"]
-        unit_tests = schema_file.unit_tests.copy()
+        saved_unit_tests = self.saved_manifest.unit_tests
+        unit_tests = [
+            unique_id
+            for unique_id in schema_file.unit_tests
+            if unique_id in saved_unit_tests and saved_unit_tests[unique_id].name == unit_test_name
+        ]
         for unique_id in unit_tests:
-            if unique_id in self.saved_manifest.unit_tests:
-                unit_test = self.saved_manifest.unit_tests[unique_id]
-                if unit_test.name == unit_test_name:
-                    self.saved_manifest.unit_tests.pop(unique_id)
-                    schema_file.unit_tests.remove(unique_id)
-            # No disabled unit tests yet
+            saved_unit_tests.pop(unique_id)
+            schema_file.unit_tests.remove(unique_id)
+        # No disabled unit tests yet
+
+    # Index one of a schema file's lists of resources (sources, exposures, etc)
+    # by the name of the yaml element that can create each unique_id, which is
+    # the part after the package name (for sources, the first part of it). The
+    # unique_ids that are disabled are also kept, because the delete_schema_*
+    # methods delete every disabled resource in the list. Each list is indexed
+    # once per schema file: the file is kept with its index, so a file that's
+    # replaced in saved_files gets a new one. Nothing adds to these lists
+    # during partial parsing, and the delete_schema_* methods remove from them
+    # with remove_unique_id_from_file, which keeps the index in step.
+    def get_unique_ids_index(
+        self, schema_file: SchemaSourceFile, key: str
+    ) -> Tuple[Dict[str, List[str]], List[str]]:
+        file_index = self._unique_ids_index.get(schema_file.file_id)
+        if file_index is None or file_index[0] is not schema_file:
+            file_index = (schema_file, {})
+            self._unique_ids_index[schema_file.file_id] = file_index
+        index = file_index[1].get(key)
+        if index is None:
+            unique_ids_by_name: Dict[str, List[str]] = {}
+            disabled_unique_ids = []
+            for unique_id in getattr(schema_file, key):
+                unique_ids_by_name.setdefault(unique_id.split(".", 3)[2], []).append(unique_id)
+                if unique_id in self.saved_manifest.disabled:
+                    disabled_unique_ids.append(unique_id)
+            index = (unique_ids_by_name, disabled_unique_ids)
+            file_index[1][key] = index
+        return index
+
+    # The unique_ids in a schema file's list of resources that can be for the
+    # yaml element with the given name, and the disabled ones. The
+    # delete_schema_* methods still check the resource's name.
+    def get_unique_ids_for_name(
+        self, schema_file: SchemaSourceFile, key: str, name: str
+    ) -> List[str]:
+        unique_ids_by_name, disabled_unique_ids = self.get_unique_ids_index(schema_file, key)
+        unique_ids = list(unique_ids_by_name.get(name.split(".", 1)[0], ()))
+        for unique_id in disabled_unique_ids:
+            if unique_id not in unique_ids:
+                unique_ids.append(unique_id)
+        return unique_ids
+
+    def remove_unique_id_from_file(
+        self, schema_file: SchemaSourceFile, key: str, unique_id: str
+    ) -> None:
+        getattr(schema_file, key).remove(unique_id)
+        file_index = self._unique_ids_index.get(schema_file.file_id)
+        if file_index is not None and file_index[0] is schema_file and key in file_index[1]:
+            unique_ids_by_name, disabled_unique_ids = file_index[1][key]
+            unique_ids_by_name[unique_id.split(".", 3)[2]].remove(unique_id)
+            if unique_id in disabled_unique_ids:
+                disabled_unique_ids.remove(unique_id)
 
     def get_schema_element(self, elem_list, elem_name):
         for element in elem_list:
@@ -1048,10 +1163,33 @@ class PartialParsing:
                 return element
         return None
 
+    # For looking up many names in the same yaml list. The first element with
+    # a given name wins, as in get_schema_element.
+    def get_schema_elements_by_name(self, elem_list) -> Dict[str, Any]:
+        elements_by_name: Dict[str, Any] = {}
+        for element in elem_list:
+            if "name" in element:
+                elements_by_name.setdefault(element["name"], element)
+        return elements_by_name
+
+    # (package_name, source_name) -> the unique_ids of the source's tables, in
+    # saved manifest order. Only needed for source overrides. Sources are only
+    # removed from the saved manifest during partial parsing, so removed ones
+    # are skipped when looking them up.
+    @cached_property
+    def source_unique_ids_by_name(self) -> Dict[Tuple[str, str], List[str]]:
+        source_unique_ids_by_name: Dict[Tuple[str, str], List[str]] = {}
+        for unique_id, source in self.saved_manifest.sources.items():
+            key = (source.package_name, source.source_name)
+            source_unique_ids_by_name.setdefault(key, []).append(unique_id)
+        return source_unique_ids_by_name
+
     def get_schema_file_for_source(self, package_name, source_name):
         schema_file = None
-        for source in self.saved_manifest.sources.values():
-            if source.package_name == package_name and source.source_name == source_name:
+        sources = self.saved_manifest.sources
+        for unique_id in self.source_unique_ids_by_name.get((package_name, source_name), ()):
+            source = sources.get(unique_id)
+            if source is not None:
                 file_id = source.file_id
                 if file_id in self.saved_files:
                     schema_file = self.saved_files[file_id]
@@ -1062,8 +1200,7 @@ class PartialParsing:
         package = source["overrides"]
         source_name = source["name"]
         orig_source_schema_file = self.get_schema_file_for_source(package, source_name)
-        orig_sources = orig_source_schema_file.dict_from_yaml["sources"]
-        orig_source = self.get_schema_element(orig_sources, source_name)
+        orig_source = orig_source_schema_file.find_element("sources", source_name)
         return (orig_source_schema_file, orig_source)
 
     def remove_source_override_target(self, source_dict):
@@ -1081,13 +1218,14 @@ class PartialParsing:
     #   env_vars_changed_schema_files: {file_id: {"yaml_key": [name, ..]}}
     def build_env_vars_to_files(self):
         unchanged_vars = []
-        changed_vars = []
+        # a set, since it's checked for every env_var used by every file
+        changed_vars = set()
         delete_vars = []
         # Check whether the env_var has changed and add it to
         # an unchanged or changed list
-        for env_var in self.saved_manifest.env_vars:
-            prev_value = self.saved_manifest.env_vars[env_var]
-            current_value = os.getenv(env_var)
+        environ = os.environ
+        for env_var, prev_value in self.saved_manifest.env_vars.items():
+            current_value = environ.get(env_var)
             if current_value is None:
                 # This will be true when depending on the default value.
                 # We store env vars set by defaults as a static string so we can recognize they have
@@ -1101,12 +1239,16 @@ class PartialParsing:
             if prev_value == current_value:
                 unchanged_vars.append(env_var)
             else:  # prev_value != current_value
-                changed_vars.append(env_var)
+                changed_vars.add(env_var)
         for env_var in delete_vars:
             del self.saved_manifest.env_vars[env_var]
 
         env_vars_changed_source_files = []
         env_vars_changed_schema_files = {}
+        if not changed_vars:
+            # No file can be affected
+            return (env_vars_changed_source_files, env_vars_changed_schema_files)
+
         # The SourceFiles contain a list of env_vars that were used in the file.
         # The SchemaSourceFiles contain a dictionary of yaml_key to schema entry names to
         # a list of vars.
@@ -1123,12 +1265,11 @@ class PartialParsing:
                     for name in source_file.env_vars[yaml_key].keys():
                         for env_var in source_file.env_vars[yaml_key][name]:
                             if env_var in changed_vars:
-                                if file_id not in env_vars_changed_schema_files:
-                                    env_vars_changed_schema_files[file_id] = {}
-                                if yaml_key not in env_vars_changed_schema_files[file_id]:
-                                    env_vars_changed_schema_files[file_id][yaml_key] = []
-                                if name not in env_vars_changed_schema_files[file_id][yaml_key]:
-                                    env_vars_changed_schema_files[file_id][yaml_key].append(name)
+                                names = env_vars_changed_schema_files.setdefault(
+                                    file_id, {}
+                                ).setdefault(yaml_key, [])
+                                if name not in names:
+                                    names.append(name)
                                 break  # if one env_var is changed we can stop
 
             else:
@@ -64,6 +64,7 @@ def load_source_file(
     )
 
     skip_loading_schema_file = False
+    old_source_file = None
     if (
         parse_file_type == ParseFileType.Schema
         and saved_files
@@ -78,14 +79,20 @@ def load_source_file(
             source_file.dfy = old_source_file.dfy
             skip_loading_schema_file = True
 
+    skip_loading_yaml = skip_loading_schema_file
     if not skip_loading_schema_file:
         # We strip the file_contents before generating the checksum because we want
         # the checksum to match the stored file contents
         file_contents = load_file_contents(path.absolute_path, strip=True)
         source_file.contents = file_contents
         source_file.checksum = FileHash.from_contents(file_contents)
+        # The modification time changed but the contents didn't (after a git
+        # checkout, for example), so the saved yaml dictionary is still good
+        if old_source_file is not None and old_source_file.checksum == source_file.checksum:
+            source_file.dfy = old_source_file.dfy
+            skip_loading_yaml = True
 
-    if parse_file_type == ParseFileType.Schema and source_file.contents:
+    if parse_file_type == ParseFileType.Schema and source_file.contents and not skip_loading_yaml:
         dfy = yaml_from_file(source_file=source_file, validate=True)
         if dfy:
             validate_yaml(source_file.path.original_file_path, dfy)
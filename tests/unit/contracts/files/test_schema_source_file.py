@@ -114,3 +114,65 @@ def test_fix_metrics_from_measure():
     ssf.fix_metrics_from_measures()
     assert ssf.generated_metrics == []
     assert ssf.metrics_from_measures == expected_metrics_from_measures
+
+
+def test_clone():
+    schema_file = SchemaSourceFile.from_dict(
+        {
+            "path": {
+                "searched_path": "models",
+                "relative_path": "schema.yml",
+                "modification_time": 1721228094.7544806,
+                "project_root": "/Users/a_user/sample_project",
+            },
+            "checksum": {"name": "sha256", "checksum": "abc"},
+            "project_name": "test",
+            "parse_file_type": "schema",
+            "dfy": {"models": [{"name": "my_model", "description": "a model"}]},
+            "ndp": ["model.test.my_model"],
+            "env_vars": {"models": {"my_model": ["MY_VAR"]}},
+        }
+    )
+    schema_file.contents = "models:\n  - name: my_model"
+    clone = schema_file.clone()
+
+    assert clone == schema_file
+    assert clone.contents is schema_file.contents
+    assert clone.path is not schema_file.path
+    assert clone.checksum is not schema_file.checksum
+
+    clone.dfy["models"][0]["description"] = "changed"
+    clone.node_patches.append("model.test.other_model")
+    clone.add_env_var("OTHER_VAR", "models", "my_model")
+    assert schema_file.dfy["models"][0]["description"] == "a model"
+    assert schema_file.node_patches == ["model.test.my_model"]
+    assert schema_file.env_vars == {"models": {"my_model": ["MY_VAR"]}}
+
+
+def test_find_element():
+    schema_file = SchemaSourceFile.from_dict(
+        {
+            "path": {
+                "searched_path": "models",
+                "relative_path": "schema.yml",
+                "modification_time": 1721228094.7544806,
+                "project_root": "/Users/a_user/sample_project",
+            },
+            "checksum": {"name": "sha256", "checksum": "abc"},
+            "project_name": "test",
+            "parse_file_type": "schema",
+            "dfy": {
+                "models": [
+                    {"name": "my_model", "description": "first"},
+                    {"name": "my_model", "description": "second"},
+                ]
+            },
+        }
+    )
+    models = schema_file.dfy["models"]
+    assert schema_file.find_element("models", "my_model") is models[0]
+    assert schema_file.find_element("models", "other_model") is None
+    assert schema_file.find_element("sources", "my_source") is None
+
+    assert schema_file.clone().find_element("models", "my_model") is not models[0]
+    assert "dfy_index" not in schema_file.to_dict()
@@ -39,6 +39,7 @@ from dbt.parser import (
     SnapshotParser,
 )
 from dbt.parser.common import YamlBlock
+from dbt.parser.macros import _parse_block, _simple_macro_node
 from dbt.parser.models import (
     _get_config_call_dict,
     _get_exp_sample_result,
@@ -56,6 +57,7 @@ from dbt.parser.schemas import (
 )
 from dbt.parser.search import FileBlock
 from dbt.parser.sources import SourcePatcher
+from dbt.parser.sql import SqlMacroParser
 from tests.unit.utils import (
     MockNode,
     config_from_parts_or_dicts,
@@ -1807,6 +1809,82 @@ class MacroParserTest(BaseParserTest):
             ["macro.snowplow.bar", "macro.snowplow.foo"],
         )
 
+    @mock.patch("dbt.parser.macros.get_flags")
+    def test_validate_macro_args(self, get_flags):
+        get_flags.return_value = Namespace(validate_macro_args=True)
+        raw_code = (
+            "{% macro foo(a, b) %}a ~ b{% endmacro %}\n"
+            "{% macro bar(c, d=1) %}{{ c + d }}{% endmacro %}"
+        )
+        block = self.file_block_for(raw_code, "macro.sql")
+        self.parser.manifest.files[block.file.file_id] = block.file
+        self.parser.parse_file(block)
+        macros = self.parser.manifest.macros
+        self.assertEqual([a.name for a in macros["macro.snowplow.foo"].arguments], ["a", "b"])
+        self.assertEqual([a.name for a in macros["macro.snowplow.bar"].arguments], ["c", "d"])
+
+    def test_no_jinja(self):
+        block = self.file_block_for("-- nothing to see here\n", "macro.sql")
+        self.parser.manifest.files[block.file.file_id] = block.file
+        with mock.patch("dbt_common.clients.jinja.extract_toplevel_blocks") as extract:
+            self.parser.parse_file(block)
+        extract.assert_not_called()
+        self.assertEqual(len(self.parser.manifest.macros), 0)
+
+    def test_macro_lookups_have_no_duplicates(self):
+        raw_code = (
+            "{% macro foo(a, b) %}a ~ b{% endmacro %}\n{% macro bar(c, d) %}c + d{% endmacro %}"
+        )
+        block = self.file_block_for(raw_code, "macro.sql")
+        self.parser.manifest.files[block.file.file_id] = block.file
+        self.parser.parse_file(block)
+        macros_by_name = self.parser.manifest.get_macros_by_name()
+        self.assertEqual([m.unique_id for m in macros_by_name["foo"]], ["macro.snowplow.foo"])
+        self.assertEqual([m.unique_id for m in macros_by_name["bar"]], ["macro.snowplow.bar"])
+
+    def test_macro_prefix_only_stripped_once(self):
+        raw_code = "{% macro foo_dbt_macro__bar() %}{{ 1 }}{% endmacro %}"
+        block = self.file_block_for(raw_code, "macro.sql")
+        self.parser.manifest.files[block.file.file_id] = block.file
+        self.parser.parse_file(block)
+        self.assertEqual(list(self.parser.manifest.macros), ["macro.snowplow.foo_dbt_macro__bar"])
+
+    def test_repeated_block_parsed_once(self):
+        _parse_block.cache_clear()
+        raw_code = "{% macro foo(a, b) %}{{ a ~ b }}{% endmacro %}"
+        block = self.file_block_for(raw_code, "macro.sql")
+        self.parser.manifest.files[block.file.file_id] = block.file
+        self.parser.parse_file(block)
+        remote_parser = SqlMacroParser(self.snowplow_project_config, self.parser.manifest)
+        remote_macros = list(remote_parser.parse_remote(raw_code))
+        self.assertEqual([m.unique_id for m in remote_macros], ["macro.snowplow.foo"])
+        cache_info = _parse_block.cache_info()
+        self.assertEqual(cache_info.misses, 1)
+        self.assertEqual(cache_info.hits, 1)
+
+    def test_simple_macro_matches_jinja_parse(self):
+        for raw_code in (
+            "{% macro foo(a, b) %}a ~ b{% endmacro %}",
+            "{%- macro foo( ) -%}\nselect 1\n{%- endmacro -%}",
+            "{%macro foo(a,b)%}select 1{%endmacro%}",
+            "{% test foo(model, column_name) %}select 1{% endtest %}",
+        ):
+            fast = _simple_macro_node(raw_code)
+            parsed = _parse_block(raw_code).body[0]
+            self.assertEqual(fast.name, parsed.name)
+            self.assertEqual([a.name for a in fast.args], [a.name for a in parsed.args])
+
+    def test_simple_macro_falls_back_to_jinja(self):
+        for raw_code in (
+            "{% macro foo() %}{{ x }}{% endmacro %}",
+            "{% macro foo(a=1) %}a{% endmacro %}",
+            "{% macro foo(a,) %}a{% endmacro %}",
+            "{% macro none() %}a{% endmacro %}",
+            "{% test foo(model) %}a{% endmacro %}",
+            "{% data_test foo(model) %}a{% enddata_test %}",
+        ):
+            self.assertIsNone(_simple_macro_node(raw_code))
+
 
 class SingularTestParserTest(BaseParserTest):
     def setUp(self):
@@ -1883,6 +1961,15 @@ class GenericTestParserTest(BaseParserTest):
             self.parser.manifest.files[file_id].macros, ["macro.snowplow.test_not_null"]
         )
 
+    def test_macro_prefix_only_stripped_once(self):
+        raw_code = "{% test foo_dbt_macro__bar(model) %}select 1{% endtest %}"
+        block = self.file_block_for(raw_code, "test_1.sql")
+        self.parser.manifest.files[block.file.file_id] = block.file
+        self.parser.parse_file(block)
+        self.assertEqual(
+            list(self.parser.manifest.macros), ["macro.snowplow.test_foo_dbt_macro__bar"]
+        )
+
 
 class AnalysisParserTest(BaseParserTest):
     def setUp(self):
@@ -1,3 +1,4 @@
+import os
 import time
 from copy import deepcopy
 from typing import Dict, List
@@ -5,6 +6,7 @@ from unittest import mock
 
 import pytest
 
+from dbt.constants import DEFAULT_ENV_PLACEHOLDER
 from dbt.contracts.files import (
     BaseSourceFile,
     FileHash,
@@ -20,12 +22,15 @@ from dbt.parser.partial import PartialParsing
 from dbt.tests.util import safe_set_invocation_context
 from tests.unit.utils import normalize
 from tests.unit.utils.manifest import (
+    make_exposure,
     make_generic_test,
     make_manifest,
     make_model,
+    make_saved_query,
     make_singular_test,
     make_source,
     make_source_snapshot,
+    make_unit_test,
 )
 
 PROJECT_NAME = "my_test"
@@ -243,7 +248,7 @@ def test_simple(partial_parsing, files, nodes):
 
 
 def test_schedule_nodes_for_parsing_basic(partial_parsing, nodes):
-    assert partial_parsing.file_diff["deleted"] == []
+    assert partial_parsing.file_diff["deleted"] == set()
     assert partial_parsing.project_parser_files == {}
     partial_parsing.schedule_nodes_for_parsing([nodes[0].unique_id])
     assert partial_parsing.project_parser_files == {
@@ -252,6 +257,31 @@ def test_schedule_nodes_for_parsing_basic(partial_parsing, nodes):
             "SchemaParser": ["my_test://models/schema.yml"],
         }
     }
+    model_file = partial_parsing.saved_files["my_test://models/my_model.sql"]
+    assert partial_parsing.already_scheduled_for_parsing(model_file)
+    untouched_file = partial_parsing.saved_files["my_test://models/my_model_untouched.sql"]
+    assert not partial_parsing.already_scheduled_for_parsing(untouched_file)
+
+
+def test_schedule_nodes_for_parsing_source(partial_parsing, source):
+    partial_parsing.schedule_nodes_for_parsing([source.unique_id, "group.my_test.missing"])
+    assert source.unique_id not in partial_parsing.saved_manifest.sources
+    assert partial_parsing.project_parser_files == {
+        "my_test": {"SchemaParser": ["my_test://models/schema.yml"]}
+    }
+
+
+def test_copy_new_file_to_saved(partial_parsing):
+    file_id = "my_test://" + normalize("models/my_model.sql")
+    new_file_copy = partial_parsing.copy_new_file_to_saved(file_id)
+    assert new_file_copy is not partial_parsing.new_files[file_id]
+    assert partial_parsing.saved_files[file_id] is new_file_copy
+    assert partial_parsing.saved_file_is_new_copy(file_id)
+    # the copy is reused while it's still the saved file
+    assert partial_parsing.copy_new_file_to_saved(file_id) is new_file_copy
+    partial_parsing.saved_files.pop(file_id)
+    assert not partial_parsing.saved_file_is_new_copy(file_id)
+    assert partial_parsing.copy_new_file_to_saved(file_id) is not new_file_copy
 
 
 def test_schedule_macro_nodes_for_parsing_basic(partial_parsing):
@@ -296,6 +326,262 @@ def test_schedule_nodes_for_parsing_versioning(partial_parsing, source) -> None:
         )
 
 
+def test_change_schema_file_keeps_dfy(partial_parsing):
+    schema_file_id = "my_test://" + normalize("models/schema.yml")
+    new_schema_file = partial_parsing.new_files[schema_file_id]
+    new_schema_file.checksum = FileHash.from_contents("changed")
+    new_schema_file.dfy = deepcopy(new_schema_file.dfy)
+    new_schema_file.dfy["models"][0]["columns"] = [{"name": "id", "tests": ["unique"]}]
+    expected_dfy = deepcopy(new_schema_file.dfy)
+    saved_schema_file = partial_parsing.saved_files[schema_file_id]
+    assert "columns" not in saved_schema_file.find_element("models", "my_model")
+    partial_parsing.build_file_diff()
+    partial_parsing.get_parsing_files()
+
+    assert "columns" in saved_schema_file.find_element("models", "my_model")
+    # what the schema parsers do to the elements they're given
+    for model in saved_schema_file.pp_dict["models"]:
+        for column in model.get("columns", []):
+            column["data_tests"] = column.pop("tests")
+    assert saved_schema_file.dfy == expected_dfy
+    assert new_schema_file.dfy == expected_dfy
+
+
+def test_env_var_change_keeps_dfy(partial_parsing):
+    schema_file_id = "my_test://" + normalize("models/schema.yml")
+    schema_file = partial_parsing.saved_files[schema_file_id]
+    new_yaml_dict = deepcopy(schema_file.dfy)
+    new_yaml_dict["models"][0]["columns"] = [{"name": "id", "tests": ["unique"]}]
+    expected_yaml_dict = deepcopy(new_yaml_dict)
+    partial_parsing.env_vars_changed_schema_files = {schema_file_id: {"models": ["my_model"]}}
+    schema_file.pp_dict = {}
+    partial_parsing.handle_schema_file_changes(schema_file, new_yaml_dict, new_yaml_dict)
+
+    # the model is scheduled, but parsing it doesn't change the new yaml dict
+    for model in schema_file.pp_dict["models"]:
+        for column in model.get("columns", []):
+            column["data_tests"] = column.pop("tests")
+    assert new_yaml_dict == expected_yaml_dict
+
+
+def test_get_schema_element(partial_parsing):
+    elements = [{"name": "a", "description": "first"}, {"description": "no name"}]
+    assert partial_parsing.get_schema_element(elements, "a") is elements[0]
+    assert partial_parsing.get_schema_element(elements, "b") is None
+
+    # the first element with a given name wins
+    elements.append({"name": "b"})
+    elements.append({"name": "a", "description": "second"})
+    assert partial_parsing.get_schema_element(elements, "b") is elements[2]
+    assert partial_parsing.get_schema_element(elements, "a") is elements[0]
+    assert partial_parsing.get_schema_elements_by_name(elements) == {
+        "a": elements[0],
+        "b": elements[2],
+    }
+
+
+def test_delete_disabled(partial_parsing):
+    first = make_model(PROJECT_NAME, "disabled_model", "", path="disabled_model.sql")
+    second = make_model(PROJECT_NAME, "disabled_model", "", path="other/disabled_model.sql")
+    unique_id = first.unique_id
+    partial_parsing.saved_manifest.disabled = {unique_id: [first, second]}
+
+    assert partial_parsing.delete_disabled(unique_id, second.file_id) is second
+    assert partial_parsing.saved_manifest.disabled == {unique_id: [first]}
+    with pytest.raises(Exception, match="Did not find disabled node"):
+        partial_parsing.delete_disabled(unique_id, second.file_id)
+    assert partial_parsing.delete_disabled(unique_id, first.file_id) is first
+    assert partial_parsing.saved_manifest.disabled == {}
+
+
+def test_merge_patch(partial_parsing):
+    schema_file = partial_parsing.saved_files["my_test://models/schema.yml"]
+    schema_file.pp_dict = {}
+    first = {"name": "a", "description": "first"}
+    partial_parsing.merge_patch(schema_file, "models", first)
+    partial_parsing.merge_patch(schema_file, "models", {"name": "b"})
+    # an already scheduled patch is kept, unless it's a new patch
+    schema_file.env_vars = {"models": {"a": ["SOME_VAR"]}}
+    partial_parsing.merge_patch(schema_file, "models", {"name": "a", "description": "same"})
+    assert schema_file.env_vars == {"models": {"a": ["SOME_VAR"]}}
+    assert schema_file.pp_dict["models"] == [first, {"name": "b"}]
+    second = {"name": "a", "description": "second"}
+    partial_parsing.merge_patch(schema_file, "models", second, new_patch=True)
+    assert schema_file.pp_dict["models"] == [{"name": "b"}, second]
+    assert partial_parsing.get_schema_element(schema_file.pp_dict["models"], "a") is second
+
+    # a pp_dict set up for an added schema file starts a new index
+    partial_parsing.handle_added_schema_file(schema_file)
+    my_model = schema_file.pp_dict["models"][0]
+    partial_parsing.merge_patch(schema_file, "models", {"name": my_model["name"]})
+    assert schema_file.pp_dict["models"][0] is my_model
+    # its lists are the yaml lists, so find_element sees added patches
+    assert schema_file.find_element("models", "c") is None
+    partial_parsing.merge_patch(schema_file, "models", {"name": "c"})
+    assert schema_file.find_element("models", "c") == {"name": "c"}
+    assert schema_file.to_dict().keys().isdisjoint({"pp_dict", "pp_dict_index"})
+
+
+def test_delete_schema_mssa_links(partial_parsing):
+    schema_file = partial_parsing.saved_files["my_test://models/schema.yml"]
+    schema_file.node_patches.extend(
+        ["model.my_test.python_model", "seed.my_test.my_model", "model.my_test.my_model.v2"]
+    )
+    partial_parsing.delete_schema_mssa_links(schema_file, "models", {"name": "my_model"})
+    assert schema_file.node_patches == ["model.my_test.python_model", "seed.my_test.my_model"]
+    assert "model.my_test.my_model" not in partial_parsing.saved_manifest.nodes
+    assert partial_parsing.project_parser_files == {
+        "my_test": {"ModelParser": ["my_test://models/my_model.sql"]}
+    }
+    # only the seed patch is removed for a seed element
+    partial_parsing.delete_schema_mssa_links(schema_file, "seeds", {"name": "my_model"})
+    assert schema_file.node_patches == ["model.my_test.python_model"]
+
+
+def test_get_unique_ids_for_name(manifest, files):
+    disabled_exposure = make_exposure(PROJECT_NAME, "disabled", path="models/schema.yml")
+    manifest.disabled = {disabled_exposure.unique_id: [disabled_exposure]}
+    schema_file = manifest.files["my_test://models/schema.yml"]
+    schema_file.exposures = [
+        "exposure.my_test.a",
+        "exposure.my_test.b",
+        "exposure.my_test.b.c",
+        disabled_exposure.unique_id,
+    ]
+    safe_set_invocation_context()
+    partial_parsing = PartialParsing(manifest, deepcopy(files))
+    get_unique_ids = partial_parsing.get_unique_ids_for_name
+
+    # every disabled resource in the list is included
+    assert get_unique_ids(schema_file, "exposures", "a") == [
+        "exposure.my_test.a",
+        disabled_exposure.unique_id,
+    ]
+    assert get_unique_ids(schema_file, "exposures", "b.c") == [
+        "exposure.my_test.b",
+        "exposure.my_test.b.c",
+        disabled_exposure.unique_id,
+    ]
+    assert get_unique_ids(schema_file, "exposures", "d") == [disabled_exposure.unique_id]
+
+    # removed unique_ids aren't found again
+    partial_parsing.remove_unique_id_from_file(schema_file, "exposures", "exposure.my_test.a")
+    partial_parsing.remove_unique_id_from_file(
+        schema_file, "exposures", disabled_exposure.unique_id
+    )
+    assert schema_file.exposures == ["exposure.my_test.b", "exposure.my_test.b.c"]
+    assert get_unique_ids(schema_file, "exposures", "a") == []
+    assert get_unique_ids(schema_file, "exposures", "b") == [
+        "exposure.my_test.b",
+        "exposure.my_test.b.c",
+    ]
+
+
+def test_delete_schema_saved_query(partial_parsing):
+    saved_query = make_saved_query(
+        PROJECT_NAME, "my_saved_query", "my_metric", path="models/schema.yml"
+    )
+    saved_manifest = partial_parsing.saved_manifest
+    saved_manifest.saved_queries[saved_query.unique_id] = saved_query
+    saved_manifest.child_map[saved_query.unique_id] = ["model.my_test.my_model"]
+    schema_file = partial_parsing.saved_files["my_test://models/schema.yml"]
+    schema_file.saved_queries = [saved_query.unique_id]
+    partial_parsing.delete_schema_saved_query(schema_file, {"name": "other_saved_query"})
+    assert saved_query.unique_id in saved_manifest.saved_queries
+    partial_parsing.delete_schema_saved_query(schema_file, {"name": saved_query.name})
+    assert saved_query.unique_id not in saved_manifest.saved_queries
+    assert schema_file.saved_queries == []
+    assert "model.my_test.my_model" not in saved_manifest.nodes
+
+
+def test_delete_schema_unit_test(partial_parsing):
+    model = make_model(PROJECT_NAME, "my_model", "")
+    unit_test = make_unit_test(PROJECT_NAME, "my_unit_test", model)
+    versioned_unit_test = make_unit_test(PROJECT_NAME, "my_unit_test", model)
+    versioned_unit_test.unique_id = f"{unit_test.unique_id}_v2"
+    other_unit_test = make_unit_test(PROJECT_NAME, "other_unit_test", model)
+    unit_tests = [unit_test, versioned_unit_test, other_unit_test]
+    for test in unit_tests:
+        partial_parsing.saved_manifest.unit_tests[test.unique_id] = test
+    schema_file = partial_parsing.saved_files["my_test://models/schema.yml"]
+    schema_file.unit_tests = [test.unique_id for test in unit_tests]
+    partial_parsing.delete_schema_unit_test(schema_file, {"name": "my_unit_test"})
+    assert schema_file.unit_tests == [other_unit_test.unique_id]
+    assert unit_test.unique_id not in partial_parsing.saved_manifest.unit_tests
+    assert versioned_unit_test.unique_id not in partial_parsing.saved_manifest.unit_tests
+
+
+def test_get_diff_for(partial_parsing):
+    saved_yaml_dict = {
+        "models": [{"name": "a"}, {"name": "b", "description": "old"}, {"name": "c"}],
+    }
+    new_yaml_dict = {
+        "models": [{"name": "b", "description": "new"}, {"name": "c"}, {"name": "d"}],
+    }
+    diff = partial_parsing.get_diff_for("models", saved_yaml_dict, new_yaml_dict)
+    assert diff["deleted"] == [{"name": "a"}]
+    assert diff["added"] == [{"name": "d"}]
+    assert diff["changed"] == [{"name": "b", "description": "new"}]
+    assert diff["changed"][0] is not new_yaml_dict["models"][0]
+    assert diff["changed_or_deleted_names"] == {"a", "b"}
+    assert partial_parsing.get_diff_for("seeds", saved_yaml_dict, new_yaml_dict) == {
+        "deleted": [],
+        "added": [],
+        "changed": [],
+    }
+
+
+def test_build_env_vars_to_files(partial_parsing):
+    partial_parsing.saved_manifest.env_vars = {
+        "SAME": "same",
+        "CHANGED": "old",
+        "UNSET": "value",
+        "DEFAULTED": DEFAULT_ENV_PLACEHOLDER,
+    }
+    partial_parsing.saved_files["my_test://models/my_model.sql"].env_vars = ["CHANGED"]
+    partial_parsing.saved_files["my_test://models/python_model.py"].env_vars = ["SAME"]
+    partial_parsing.saved_files["my_test://models/schema.yml"].env_vars = {
+        "models": {"my_model": ["SAME", "UNSET"], "python_model": ["DEFAULTED"]},
+    }
+    env = {"SAME": "same", "CHANGED": "new"}
+    with mock.patch.dict(os.environ, env, clear=True):
+        source_files, schema_files = partial_parsing.build_env_vars_to_files()
+    assert source_files == ["my_test://models/my_model.sql"]
+    assert schema_files == {"my_test://models/schema.yml": {"models": ["my_model"]}}
+    assert partial_parsing.saved_manifest.env_vars == {
+        "SAME": "same",
+        "CHANGED": "old",
+        "DEFAULTED": DEFAULT_ENV_PLACEHOLDER,
+    }
+
+
+def test_get_schema_file_for_source(partial_parsing, source):
+    schema_file = partial_parsing.saved_files["my_test://models/schema.yml"]
+    get_schema_file = partial_parsing.get_schema_file_for_source
+    assert get_schema_file("my_test", "my_source") is schema_file
+    assert get_schema_file("my_test", "other_source") is None
+    partial_parsing.saved_manifest.sources.pop(source.unique_id)
+    assert get_schema_file("my_test", "my_source") is None
+
+
+def test_recursively_gather_macro_references(partial_parsing):
+    partial_parsing.macro_child_map = {
+        "macro.my_test.a": ["model.my_test.x", "macro.my_test.b", "model.my_test.y"],
+        "macro.my_test.b": ["macro.my_test.c", "model.my_test.x"],
+        "macro.my_test.c": ["macro.my_test.a", "model.my_test.z"],
+    }
+    referencing_nodes = []
+    partial_parsing.recursively_gather_macro_references("macro.my_test.a", referencing_nodes)
+    assert referencing_nodes == [
+        "model.my_test.x",
+        "macro.my_test.b",
+        "macro.my_test.c",
+        "macro.my_test.a",
+        "model.my_test.y",
+        "model.my_test.z",
+    ]
+
+
 class TestFileDiff:
     @pytest.fixture
     def partial_parsing(self, manifest, files):
@@ -340,3 +626,24 @@ class TestFileDiff:
                 "SingularTestParser": ["my_test://tests/my_singular_test.sql"],
             },
         }
+
+    def test_build_file_diff_env_vars_changed(self, partial_parsing):
+        partial_parsing.env_vars_changed_source_files = [
+            "my_test://models/my_model.sql",
+            "my_test://tests/my_singular_test.sql",
+        ]
+        partial_parsing.env_vars_changed_schema_files = {
+            "my_test://models/schema.yml": {"models": ["my_model"]},
+            "my_test://tests/tests.yml": {"unit_tests": ["my_unit_test"]},
+        }
+        partial_parsing.build_file_diff()
+        assert set(partial_parsing.file_diff["changed"]) == {
+            "my_test://models/python_model_untouched.py",
+            "my_test://tests/my_singular_test.sql",
+            "my_test://models/my_model.sql",
+        }
+        assert len(partial_parsing.file_diff["changed"]) == 3
+        assert partial_parsing.file_diff["changed_schema_files"] == [
+            "my_test://models/schema.yml",
+            "my_test://tests/tests.yml",
+        ]